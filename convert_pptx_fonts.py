@@ -1,61 +1,204 @@
 import argparse
+import contextlib
+import functools
+import io
 import os
-import shutil
+import re
 import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import xml.etree.ElementTree as ET
+from typing import Optional
 
+from lxml import etree as ET
+
+try:
+    import deflate
+except ImportError:  # optional: libdeflate bindings for a faster repack
+    deflate = None
+
+DRAWINGML_NAMESPACE = "http://schemas.openxmlformats.org/drawingml/2006/main"
+TYPEFACE_KEYS = frozenset(["typeface", f"{{{DRAWINGML_NAMESPACE}}}typeface"])
+
+# ``typeface`` attributes as Office serializes them: always double-quoted.
+# They are only swapped inside start tags that mention ``typeface``, never in
+# text content, where Office writes ``"`` unescaped.
+TYPEFACE_ATTRIBUTE = re.compile(rb'(?<=\s)typeface="[^"]*"')
+TYPEFACE_START_TAG = re.compile(rb"<[A-Za-z][^<>]*typeface[^<>]*>")
+XML_ENCODING_DECLARATION = re.compile(rb"^<\?xml[^>]*?encoding=[\"']([^\"']+)[\"']")
+# Font names that can be written into an attribute value without escaping.
+XML_SAFE_FONT_NAME = re.compile(r'[^"&<>\x00-\x1f]+')
+
+# Below this many XML parts, starting worker processes costs more than it saves.
+PARALLEL_MIN_PARTS = 4
+
+# Deflate level for the rewritten archive.  Font substitution is not
+# archival work, so trade a little size for a much faster repack.
+DEFAULT_COMPRESS_LEVEL = 3
+
+
+def replace_font_in_raw_xml(data: bytes, new_font: str) -> Optional[bytes]:
+    """Swap typeface attribute values in a serialized XML part without parsing it.
+
+    Returns the updated part, or ``None`` when the part cannot safely be
+    edited as raw bytes and has to go through :func:`replace_font_in_xml`.
+    """
+    if not XML_SAFE_FONT_NAME.fullmatch(new_font):
+        return None
+
+    declaration = XML_ENCODING_DECLARATION.match(data)
+    if declaration is not None and declaration.group(1).lower() not in (b"utf-8", b"utf8"):
+        return None
+
+    # Comments and CDATA sections can hold tag-like text; leave them to the parser.
+    if b"<!--" in data or b"<![CDATA[" in data:
+        return None
+
+    replacement = b'typeface="' + new_font.encode("utf-8") + b'"'
+    count = 0
+
+    def swap_typefaces(tag_match: "re.Match[bytes]") -> bytes:
+        nonlocal count
+        tag, tag_count = TYPEFACE_ATTRIBUTE.subn(lambda _match: replacement, tag_match.group())
+        count += tag_count
+        return tag
+
+    updated = TYPEFACE_START_TAG.sub(swap_typefaces, data)
+
+    # Every mention of "typeface" must be an attribute just swapped inside a
+    # start tag; anything else (prefixed attributes, text content) needs a
+    # real parse.
+    if count == 0 or count != data.count(b"typeface"):
+        return None
+
+    return updated
+
+
+def replace_font_in_xml(data: bytes, new_font: str) -> Optional[bytes]:
+    """Replace all typeface attributes in a single XML part.
+
+    Returns the re-serialized part, or ``None`` when nothing was replaced or
+    the part is not well-formed XML.
+    """
+    # Stream the part and rewrite attributes as each element is opened, so
+    # the document is only walked once while it is being built.  Elements are
+    # not cleared afterwards because the full tree is serialized below.
+    context = ET.iterparse(io.BytesIO(data), events=("start",))
+    replaced = False
 
-def replace_font_in_xml(xml_path: Path, new_font: str) -> bool:
-    """Replace all typeface attributes in a single XML file."""
     try:
-        tree = ET.parse(xml_path)
+        for _event, elem in context:
+            for attr_key in TYPEFACE_KEYS.intersection(elem.keys()):
+                if elem.get(attr_key) != new_font:
+                    elem.set(attr_key, new_font)
+                    replaced = True
     except ET.ParseError:
-        return False
+        return None
 
-    root = tree.getroot()
-    replaced = False
+    if not replaced:
+        return None
 
-    for elem in root.iter():
-        attribs = list(elem.attrib.items())
-        for attr_key, attr_val in attribs:
-            if attr_key.startswith("{"):
-                attr_name = attr_key.split("}", 1)[1]
-            else:
-                attr_name = attr_key
+    return ET.tostring(context.root.getroottree(), encoding="utf-8", xml_declaration=True)
 
-            if attr_name == "typeface" and attr_val != new_font:
-                elem.set(attr_key, new_font)
-                replaced = True
 
-    if replaced:
-        tree.write(xml_path, encoding="utf-8", xml_declaration=True)
+class _LibdeflateCompressor:
+    """``zlib.compressobj`` stand-in that deflates a whole entry with libdeflate.
 
-    return replaced
+    libdeflate has no streaming API, so data is buffered until ``flush``.
+    ``ZipFile.writestr`` hands over each part in a single write anyway.
+    """
 
+    def __init__(self, level: int) -> None:
+        self._level = level
+        self._chunks: list = []
 
-def convert_pptx_fonts(source_pptx: Path, output_pptx: Path, new_font: str) -> None:
-    if not source_pptx.exists():
-        raise FileNotFoundError(f"Source PPTX file not found: {source_pptx}")
+    def compress(self, data: bytes) -> bytes:
+        self._chunks.append(bytes(data))
+        return b""
+
+    def flush(self) -> bytes:
+        return deflate.deflate_compress(b"".join(self._chunks), self._level)
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
 
-        with zipfile.ZipFile(source_pptx, "r") as pptx_zip:
-            pptx_zip.extractall(tmp_path)
+@contextlib.contextmanager
+def _deflate_backend():
+    """Route ``zipfile``'s deflate compression through libdeflate when available."""
+    if deflate is None:
+        yield
+        return
 
-        for xml_file in tmp_path.rglob("*.xml"):
-            replace_font_in_xml(xml_file, new_font)
+    zlib_get_compressor = zipfile._get_compressor
 
-        if output_pptx.exists():
-            os.remove(output_pptx)
+    def get_compressor(compress_type, compresslevel=None):
+        if compress_type == zipfile.ZIP_DEFLATED:
+            return _LibdeflateCompressor(6 if compresslevel is None else compresslevel)
+        return zlib_get_compressor(compress_type, compresslevel)
 
-        with zipfile.ZipFile(output_pptx, "w", zipfile.ZIP_DEFLATED) as new_zip:
-            for file_path in sorted(tmp_path.rglob("*")):
-                if file_path.is_file():
-                    archive_name = file_path.relative_to(tmp_path)
-                    new_zip.write(file_path, arcname=str(archive_name))
+    zipfile._get_compressor = get_compressor
+    try:
+        yield
+    finally:
+        zipfile._get_compressor = zlib_get_compressor
+
+
+def convert_pptx_fonts(
+    source_pptx: Path,
+    output_pptx: Path,
+    new_font: str,
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+) -> None:
+    if not source_pptx.exists():
+        raise FileNotFoundError(f"Source PPTX file not found: {source_pptx}")
+    if output_pptx.exists() and output_pptx.samefile(source_pptx):
+        raise ValueError(f"Output PPTX must differ from the source file: {output_pptx}")
+
+    # Parts are streamed straight from the source archive into the output
+    # archive; nothing is extracted to disk.
+    with zipfile.ZipFile(source_pptx, "r") as source_zip:
+        entries = source_zip.infolist()
+        xml_parts = {
+            entry.filename: source_zip.read(entry)
+            for entry in entries
+            if entry.filename.endswith(".xml")
+        }
+        # A substring scan is far cheaper than a parse, and most parts
+        # (content types, document properties, ...) never mention a typeface.
+        font_part_names = [name for name, data in xml_parts.items() if b"typeface" in data]
+
+        # Most parts only need their attribute values swapped, which is done
+        # on the raw bytes; only the remaining parts are parsed.
+        parse_part_names = []
+        for name in font_part_names:
+            updated = replace_font_in_raw_xml(xml_parts[name], new_font)
+            if updated is None:
+                parse_part_names.append(name)
+            else:
+                xml_parts[name] = updated
+        font_parts = [xml_parts[name] for name in parse_part_names]
+
+        replace_font = functools.partial(replace_font_in_xml, new_font=new_font)
+        if len(font_parts) < PARALLEL_MIN_PARTS:
+            rewritten_parts = [replace_font(part) for part in font_parts]
+        else:
+            # Every part is independent, so parse them across all cores.
+            with ProcessPoolExecutor() as executor:
+                rewritten_parts = list(executor.map(replace_font, font_parts, chunksize=4))
+
+        for name, part in zip(parse_part_names, rewritten_parts):
+            if part is not None:
+                xml_parts[name] = part
+
+        with _deflate_backend(), zipfile.ZipFile(
+            output_pptx, "w", zipfile.ZIP_DEFLATED, compresslevel=compress_level
+        ) as new_zip:
+            for entry in entries:
+                data = xml_parts.get(entry.filename)
+                if data is None:
+                    data = source_zip.read(entry)
+                # Reusing the source ZipInfo keeps each part's name, order,
+                # timestamp and compression method.  The level has to be
+                # passed again because ZipInfo carries its own (default) one.
+                new_zip.writestr(entry, data, compresslevel=compress_level)
 
 
 def main() -> None:
@@ -75,24 +218,34 @@ def main() -> None:
         type=Path,
         help="Optional path for the output PPTX file (default: overwrite source)",
     )
+    parser.add_argument(
+        "--level",
+        type=int,
+        choices=range(0, 10),
+        default=DEFAULT_COMPRESS_LEVEL,
+        metavar="{0-9}",
+        help=f"Deflate compression level for the output file (default: {DEFAULT_COMPRESS_LEVEL})",
+    )
 
     args = parser.parse_args()
 
     source = args.source
     output = args.output if args.output else source
 
-    # If we overwrite the source file, save to temp file first
-    if output == source:
-        with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp_output:
+    # If we overwrite the source file, save to temp file first.  Creating it
+    # next to the source keeps both on one filesystem, so os.replace is a
+    # single atomic rename rather than a copy.
+    if output == source or (output.exists() and output.samefile(source)):
+        with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False, dir=source.parent) as tmp_output:
             tmp_output_path = Path(tmp_output.name)
         try:
-            convert_pptx_fonts(source, tmp_output_path, args.font)
-            shutil.move(tmp_output_path, source)
+            convert_pptx_fonts(source, tmp_output_path, args.font, args.level)
+            os.replace(tmp_output_path, source)
         finally:
             if tmp_output_path.exists():
                 tmp_output_path.unlink(missing_ok=True)
     else:
-        convert_pptx_fonts(source, output, args.font)
+        convert_pptx_fonts(source, output, args.font, args.level)
 
 
 if __name__ == "__main__":
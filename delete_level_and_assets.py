@@ -1,5 +1,7 @@
 """Utility to delete a selected level and any assets that are exclusively referenced by it."""
 
+from collections import deque
+
 import unreal
 
 
@@ -39,61 +41,92 @@ def _get_selected_level_asset_data() -> unreal.AssetData:
 
 def _gather_recursive_dependencies(asset_registry: unreal.AssetRegistry, package_name: str) -> set[str]:
     """Gather all hard dependencies for the given package, recursively."""
-    to_process = [package_name]
-    visited: set[str] = set()
-    dependencies: set[str] = set()
+    # Packages are marked visited when queued, so each one is fetched once and
+    # the visited set doubles as the result.
+    to_process = deque([package_name])
+    visited: set[str] = {package_name}
 
     while to_process:
-        current = to_process.pop()
-        if current in visited:
-            continue
-        visited.add(current)
-
-        direct_dependencies = asset_registry.get_dependencies(current, DEP_OPTIONS)
-        for dependency in direct_dependencies:
-            if dependency == package_name:
-                continue
-            if dependency not in dependencies:
-                dependencies.add(dependency)
+        current = to_process.popleft()
+        for dependency in asset_registry.get_dependencies(current, DEP_OPTIONS):
             if dependency not in visited:
+                visited.add(dependency)
                 to_process.append(dependency)
 
-    dependencies.discard(package_name)
-    return dependencies
+    visited.discard(package_name)
+    return visited
 
 
 def _compute_exclusive_assets(asset_registry: unreal.AssetRegistry, level_package: str, candidate_packages: set[str]) -> set[str]:
     """Return the subset of candidate packages that are only referenced by the level or other candidates."""
-    exclusive = set(candidate_packages)
-    changed = True
-
-    while changed and exclusive:
-        changed = False
-        for package in list(exclusive):
-            referencers = asset_registry.get_referencers(package, DEP_OPTIONS)
-            for referencer in referencers:
-                if referencer == level_package:
-                    continue
-                if referencer not in exclusive:
-                    exclusive.remove(package)
-                    changed = True
-                    break
-    return exclusive
+    # Fetch each package's referencers exactly once.  A package is shared as
+    # soon as something outside the candidates references it; record which
+    # candidates each candidate references so sharing can be propagated.
+    candidate_dependencies: dict[str, list[str]] = {}
+    shared: set[str] = set()
+
+    for package in candidate_packages:
+        for referencer in asset_registry.get_referencers(package, DEP_OPTIONS):
+            if referencer == level_package:
+                continue
+            if referencer in candidate_packages:
+                candidate_dependencies.setdefault(referencer, []).append(package)
+            else:
+                shared.add(package)
+
+    # Anything a shared package references must be kept as well.
+    to_process = list(shared)
+    while to_process:
+        current = to_process.pop()
+        for dependency in candidate_dependencies.get(current, ()):
+            if dependency not in shared:
+                shared.add(dependency)
+                to_process.append(dependency)
+
+    return set(candidate_packages) - shared
 
 
 def _delete_assets(asset_registry: unreal.AssetRegistry, package_names: set[str]) -> None:
     """Delete all assets contained in the provided packages."""
+    object_paths: list[str] = []
     for package_name in sorted(package_names):
         assets = asset_registry.get_assets_by_package_name(package_name)
         if not assets:
             unreal.log_warning(f"No assets found in package '{package_name}', skipping.")
             continue
-        for asset_data in assets:
-            object_path = asset_data.get_object_path_string()
-            if unreal.EditorAssetLibrary.delete_asset(object_path):
+        object_paths.extend(asset_data.get_object_path_string() for asset_data in assets)
+
+    if not object_paths:
+        return
+
+    # Delete everything in one call so the transaction, source control check
+    # and garbage collection run once for the batch rather than per asset.
+    loaded_assets = []
+    for object_path in object_paths:
+        asset = unreal.EditorAssetLibrary.load_asset(object_path)
+        if asset:
+            loaded_assets.append(asset)
+        else:
+            unreal.log_error(f"Failed to load asset: {object_path}")
+
+    batch_attempted = len(loaded_assets) == len(object_paths)
+    if batch_attempted:
+        if unreal.EditorAssetLibrary.delete_loaded_assets(loaded_assets):
+            for object_path in object_paths:
                 unreal.log(f"Deleted asset: {object_path}")
-            else:
-                unreal.log_error(f"Failed to delete asset: {object_path}")
+            return
+        unreal.log_warning("Batch delete failed, deleting the remaining assets one at a time.")
+    else:
+        unreal.log_warning("Not every asset could be loaded, deleting assets one at a time.")
+
+    for object_path in object_paths:
+        # Only a batch call that ran can have removed assets already.
+        if batch_attempted and not unreal.EditorAssetLibrary.does_asset_exist(object_path):
+            unreal.log(f"Deleted asset: {object_path}")
+        elif unreal.EditorAssetLibrary.delete_asset(object_path):
+            unreal.log(f"Deleted asset: {object_path}")
+        else:
+            unreal.log_error(f"Failed to delete asset: {object_path}")
 
 
 def delete_selected_level_and_dependencies() -> None:
@@ -29,11 +29,15 @@ def _gather_light_components(actor: unreal.Actor) -> list[unreal.LightComponentB
     also surface lights that are created inside user Blueprints.
     """
 
-    components = []
+    try:
+        components = list(actor.get_components_by_class(LIGHT_COMPONENT_BASE_CLASS))
+    except Exception:
+        components = []
 
-    # Some actor types (e.g. SkyLight, DirectionalLight, etc.) expose their
-    # primary light component via ``get_light_component``.
-    if hasattr(actor, "get_light_component"):
+    # The query above already includes the primary component of actors such
+    # as SkyLight or DirectionalLight.  Only ask for it explicitly when the
+    # query came back empty.
+    if not components and hasattr(actor, "get_light_component"):
         try:
             light_component = actor.get_light_component()
         except Exception:
@@ -41,48 +45,38 @@ def _gather_light_components(actor: unreal.Actor) -> list[unreal.LightComponentB
         if isinstance(light_component, LIGHT_COMPONENT_BASE_CLASS):
             components.append(light_component)
 
-    try:
-        owned_components = actor.get_components_by_class(LIGHT_COMPONENT_BASE_CLASS)
-    except Exception:
-        owned_components = []
-
-    if owned_components:
-        components.extend(owned_components)
-
-    # ``get_components_by_class`` already returns unique components, but the
-    # explicit call above can yield duplicates when ``get_light_component`` is
-    # also available.  Use ``dict.fromkeys`` to de-duplicate while preserving
-    # ordering.
-    unique_components = list(dict.fromkeys(components))
-    return unique_components
+    return components
 
 
 def _set_mobility(component: unreal.LightComponentBase) -> bool:
     """Set ``component`` to Movable mobility.
 
     Returns ``True`` if the component's mobility was changed, ``False``
-    otherwise.
+    otherwise.  The caller is responsible for calling ``post_edit_change`` on
+    the owning actor and for marking the affected packages dirty.
     """
 
     if component is None:
         return False
 
+    # Read the exposed property directly; fall back to the reflection lookup
+    # for component types that do not surface it as an attribute.
     try:
-        current_mobility = component.get_editor_property("mobility")
-    except Exception:
-        return False
+        current_mobility = component.mobility
+    except AttributeError:
+        try:
+            current_mobility = component.get_editor_property("mobility")
+        except Exception:
+            return False
 
     if current_mobility == MOVABLE:
         return False
 
+    # Write through the editor property so the component still receives its
+    # Mobility edit notification (lighting cache, stationary shadow channels);
+    # the caller's per-actor ``post_edit_change`` does not carry the property.
     component.modify()
     component.set_editor_property("mobility", MOVABLE)
-    component.post_edit_change()
-
-    outer_package = component.get_outermost()
-    if outer_package is not None:
-        outer_package.mark_package_dirty()
-
     return True
 
 
@@ -92,35 +86,56 @@ def convert_all_lights_to_movable() -> None:
     actors = unreal.EditorLevelLibrary.get_all_level_actors()
     total_components = 0
     updated_components = 0
-    touched_levels: set[unreal.Package] = set()
-
-    for actor in actors:
-        light_components = _gather_light_components(actor)
-        if not light_components:
-            continue
-
-        actor_changed = False
-        for component in light_components:
-            total_components += 1
-            if _set_mobility(component):
-                updated_components += 1
-                actor_changed = True
-
-        if actor_changed:
-            actor.modify()
-            actor.post_edit_change()
-
-            level = actor.get_level()
-            if level is not None:
-                package = level.get_outermost()
-                if package is not None:
-                    touched_levels.add(package)
-
-    for package in touched_levels:
+    scanned_actors = 0
+    touched_packages: set[unreal.Package] = set()
+
+    # One transaction keeps the whole pass as a single undo step, and the slow
+    # task keeps the editor from redrawing between actors.
+    with unreal.ScopedEditorTransaction("Set All Lights Movable"), unreal.ScopedSlowTask(
+        len(actors), "Setting lights to Movable"
+    ) as slow_task:
+        slow_task.make_dialog(True)
+
+        for actor in actors:
+            if slow_task.should_cancel():
+                unreal.log_warning("Light conversion cancelled by user.")
+                break
+            slow_task.enter_progress_frame(1)
+            scanned_actors += 1
+
+            light_components = _gather_light_components(actor)
+            if not light_components:
+                continue
+
+            actor_changed = False
+            for component in light_components:
+                total_components += 1
+                if _set_mobility(component):
+                    updated_components += 1
+                    actor_changed = True
+
+                    # With one file per actor the component lives in its
+                    # own package rather than the level's.
+                    component_package = component.get_outermost()
+                    if component_package is not None:
+                        touched_packages.add(component_package)
+
+            # Rebuild once per actor instead of once per changed component.
+            if actor_changed:
+                actor.modify()
+                actor.post_edit_change()
+
+                level = actor.get_level()
+                if level is not None:
+                    package = level.get_outermost()
+                    if package is not None:
+                        touched_packages.add(package)
+
+    for package in touched_packages:
         package.mark_package_dirty()
 
     unreal.log(
-        f"Scanned {len(actors)} actors. "
+        f"Scanned {scanned_actors} of {len(actors)} actors. "
         f"Found {total_components} light components and updated {updated_components} to Movable."
     )
 